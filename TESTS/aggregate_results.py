@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+aggregate_results.py
+
+Agrège le store de mesures par pod (TESTS/RESULTS/measurements.jsonl) sur
+l'ensemble des runs et des scénarios.
+
+Le store est alimenté par test_academic_scenarios.sh (une ligne par pod, depuis
+l'API Kubernetes) et par le scheduler RL (temps de binding et de décision).
+Chaque métrique a une seule définition pour tous les scénarios:
+scheduling_latency_ms vient uniquement de l'API (PodScheduled - création), la
+latence mesurée par le scheduler RL est dans rl_observed_latency_ms.
+Les lignes partielles d'un même pod sont fusionnées par (run_id, scenario, pod):
+la première valeur non nulle de chaque colonne est conservée.
+
+Pour chaque scénario et métrique: p50/p95/p99 calculés par run, puis moyenne
+sur les runs avec intervalle de confiance bootstrap (vectorisé NumPy).
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RESULTS_FOLDER = "TESTS/RESULTS"
+MEASUREMENTS_FILE = f"{RESULTS_FOLDER}/measurements.jsonl"
+
+COLUMNS = [
+    "run_id", "scenario", "scheduler", "pod", "node",
+    "scheduling_latency_ms", "rl_observed_latency_ms", "bind_ms", "decision_ms",
+    "latency_est_ms", "timestamp",
+]
+METRICS = ["latency_est_ms", "scheduling_latency_ms", "rl_observed_latency_ms", "bind_ms", "decision_ms"]
+PERCENTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+
+
+def load_measurements(path=MEASUREMENTS_FILE):
+    """Charge le store JSONL (ou CSV) et fusionne les lignes partielles d'un même pod."""
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    if path.suffix == ".csv":
+        df = pd.read_csv(path)
+    else:
+        df = pd.read_json(path, lines=True, dtype={"run_id": str})
+    if df.empty:
+        return None
+
+    df = df.reindex(columns=COLUMNS)
+    for metric in METRICS:
+        df[metric] = pd.to_numeric(df[metric], errors="coerce")
+
+    return df.groupby(["run_id", "scenario", "pod"], as_index=False, sort=False).first()
+
+
+def per_run_percentiles(df, metric):
+    """Percentiles d'une métrique pour chaque (scénario, run)."""
+    values = df.dropna(subset=[metric])
+    if values.empty:
+        return pd.DataFrame(columns=list(PERCENTILES))
+    table = (values.groupby(["scenario", "run_id"])[metric]
+             .quantile(list(PERCENTILES.values()))
+             .unstack())
+    table.columns = list(PERCENTILES)
+    return table
+
+
+def bootstrap_ci(samples, n_boot=2000, alpha=0.05, seed=0):
+    """
+    IC bootstrap de la moyenne, colonne par colonne pour un tableau (n_runs, k).
+    Tous les ré-échantillonnages sont tirés et moyennés en une seule opération.
+    """
+    samples = np.asarray(samples, dtype=float)
+    mean = samples.mean(axis=0)
+    if len(samples) < 2:
+        return mean, mean, mean
+
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(samples), size=(n_boot, len(samples)))
+    means = samples[idx].mean(axis=1)
+    low, high = np.quantile(means, [alpha / 2, 1 - alpha / 2], axis=0)
+    return mean, low, high
+
+
+def aggregate(df, metrics=METRICS, n_boot=2000, alpha=0.05):
+    """
+    Résumé par (scénario, métrique, percentile): moyenne sur les runs et IC.
+
+    Returns:
+        DataFrame avec colonnes scenario, metric, percentile, mean, ci_low,
+        ci_high, n_runs, n_pods
+    """
+    rows = []
+    for metric in metrics:
+        table = per_run_percentiles(df, metric)
+        if table.empty:
+            continue
+        n_pods = df.dropna(subset=[metric]).groupby("scenario").size()
+        for scenario, runs in table.groupby(level="scenario"):
+            mean, low, high = bootstrap_ci(runs[list(PERCENTILES)].to_numpy(), n_boot, alpha)
+            for i, name in enumerate(PERCENTILES):
+                rows.append({
+                    "scenario": scenario,
+                    "metric": metric,
+                    "percentile": name,
+                    "mean": mean[i],
+                    "ci_low": low[i],
+                    "ci_high": high[i],
+                    "n_runs": len(runs),
+                    "n_pods": int(n_pods.get(scenario, 0)),
+                })
+    return pd.DataFrame(rows)
+
+
+def node_distribution(df, n_boot=2000, alpha=0.05):
+    """Nombre moyen de pods par nœud et par run, avec IC, pour chaque scénario."""
+    counts = (df.dropna(subset=["node"])
+              .groupby(["scenario", "run_id", "node"]).size()
+              .unstack("node", fill_value=0))
+    rows = []
+    for scenario, runs in counts.groupby(level="scenario"):
+        mean, low, high = bootstrap_ci(runs.to_numpy(), n_boot, alpha)
+        for i, node in enumerate(counts.columns):
+            rows.append({"scenario": scenario, "node": node, "mean": mean[i],
+                         "ci_low": low[i], "ci_high": high[i], "n_runs": len(runs)})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agrégation multi-runs des mesures de scheduling")
+    parser.add_argument("--input", default=MEASUREMENTS_FILE)
+    parser.add_argument("--output", default=f"{RESULTS_FOLDER}/summary.csv")
+    parser.add_argument("--bootstrap", type=int, default=2000)
+    parser.add_argument("--alpha", type=float, default=0.05)
+    args = parser.parse_args()
+
+    df = load_measurements(args.input)
+    if df is None:
+        print(f"❌ Erreur: Aucune mesure dans {args.input}")
+        return
+
+    summary = aggregate(df, n_boot=args.bootstrap, alpha=args.alpha)
+    print(f"📊 {df['run_id'].nunique()} runs, {len(df)} pods, scénarios: {', '.join(sorted(df['scenario'].unique()))}")
+    print(summary.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    summary.to_csv(args.output, index=False)
+    print(f"✅ Résumé sauvegardé: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+benchmark_startup.py
+
+Mesure le temps de démarrage à froid du scheduler RL.
+- Phases agent (import, construction, chargement modèle, 1re inférence),
+  en mode complet (PyTorch, target network + optimizer) vs inférence seule
+  (forward pass NumPy: PyTorch ne doit pas être importé)
+- Optionnel (--cluster): délai jusqu'à /healthz puis /readyz du vrai processus
+
+Chaque mesure est faite dans un interpréteur neuf pour inclure les imports.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+RESULTS_FOLDER = "TESTS/RESULTS"
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+AGENT_SNIPPET = """
+import json, sys, time
+t0 = time.perf_counter()
+import numpy as np
+from schedulers.rl_agent import RLSchedulerAgent
+t1 = time.perf_counter()
+agent = RLSchedulerAgent(state_size=7, use_dqn=True, model_path={model!r}, inference_only={inference})
+t2 = time.perf_counter()
+agent.load_model()
+t3 = time.perf_counter()
+agent.select_action(np.zeros((1, 7)), ["warmup"], training=False)
+t4 = time.perf_counter()
+print(json.dumps({{"import_ms": (t1 - t0) * 1e3, "build_ms": (t2 - t1) * 1e3,
+                  "load_ms": (t3 - t2) * 1e3, "first_inference_ms": (t4 - t3) * 1e3,
+                  "total_ms": (t4 - t0) * 1e3, "torch_imported": "torch" in sys.modules}}))
+"""
+
+
+def run_agent_startup(model_path, inference_only):
+    """Lance un interpréteur neuf et retourne le temps de chaque phase (ms)."""
+    code = AGENT_SNIPPET.format(model=model_path, inference=inference_only)
+    out = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def wait_for(url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=0.2) as resp:
+                if resp.status == 200:
+                    return True
+        except Exception:
+            pass
+        time.sleep(0.005)
+    return False
+
+
+def run_process_startup(port, timeout_s=60.0):
+    """Démarre le scheduler et mesure le délai jusqu'à liveness et readiness (ms)."""
+    env = dict(os.environ, RL_HEALTH_PORT=str(port), PYTHONUNBUFFERED="1")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "schedulers.ia_scheduler_rl"], cwd=PROJECT_ROOT,
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = t0 + timeout_s
+        live = wait_for(f"http://127.0.0.1:{port}/healthz", deadline)
+        t_live = time.perf_counter()
+        ready = live and wait_for(f"http://127.0.0.1:{port}/readyz", deadline)
+        t_ready = time.perf_counter()
+    finally:
+        proc.terminate()
+        proc.wait()
+    return {
+        "live_ms": (t_live - t0) * 1e3 if live else None,
+        "ready_ms": (t_ready - t0) * 1e3 if ready else None,
+    }
+
+
+def summarize(runs):
+    """Médiane de chaque phase sur toutes les répétitions."""
+    keys = [k for k in runs[0] if k != "torch_imported"]
+    return {k: statistics.median(r[k] for r in runs if r[k] is not None)
+            if any(r[k] is not None for r in runs) else None
+            for k in keys}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du démarrage à froid du scheduler RL")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--model", default="rl_scheduler_model.pth")
+    parser.add_argument("--cluster", action="store_true",
+                        help="Mesure aussi /healthz et /readyz du vrai scheduler (cluster requis)")
+    parser.add_argument("--port", type=int, default=18080)
+    args = parser.parse_args()
+
+    print(f"⏱️  Benchmark démarrage ({args.runs} répétitions)...")
+    results = {"runs": args.runs}
+    for label, inference in (("full", False), ("inference_only", True)):
+        runs = [run_agent_startup(args.model, inference) for _ in range(args.runs)]
+        results[label] = summarize(runs)
+        results[label]["torch_imported"] = any(r["torch_imported"] for r in runs)
+        print(f"  {label:15s} " + " | ".join(f"{k}: {v:.1f}" for k, v in results[label].items()
+                                               if k != "torch_imported")
+              + f" | torch importé: {results[label]['torch_imported']}")
+
+    if args.cluster:
+        runs = [run_process_startup(args.port) for _ in range(args.runs)]
+        results["process"] = summarize(runs)
+        print("  process         " + " | ".join(
+            f"{k}: {v:.1f}" if v is not None else f"{k}: timeout" for k, v in results["process"].items()))
+
+    Path(RESULTS_FOLDER).mkdir(parents=True, exist_ok=True)
+    output = f"{RESULTS_FOLDER}/startup_benchmark.json"
+    with open(output, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"✅ Résultats sauvegardés: {output}")
+
+
+if __name__ == "__main__":
+    main()
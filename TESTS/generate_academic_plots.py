@@ -4,16 +4,27 @@ generate_academic_plots.py
 
 Génère les graphiques académiques pour le rapport de recherche.
 Focus : Comparaison Latence Baseline vs EL avec affichage du gain.
+
+Les données viennent du store multi-runs (TESTS/RESULTS/measurements.jsonl),
+agrégé par aggregate_results.py: chaque barre est la moyenne sur les runs,
+avec son intervalle de confiance à 95%.
 """
 
-import json
 import matplotlib.pyplot as plt
 import numpy as np
-import re
 from pathlib import Path
 
+from aggregate_results import MEASUREMENTS_FILE, aggregate, load_measurements, node_distribution
+
 # Définition du chemin du répertoire de sortie
 RESULTS_FOLDER = "TESTS/RESULTS"
+BASELINE_SCENARIO = "baseline"
+
+# Libellés connus, les autres scénarios sont affichés sous leur clé
+SCENARIO_LABELS = {
+    "baseline": "Baseline",
+    "el_latency": "EL (Latency)",
+}
 
 # Style académique
 plt.style.use('seaborn-v0_8-paper')
@@ -25,106 +36,98 @@ plt.rcParams['ytick.labelsize'] = 10
 plt.rcParams['legend.fontsize'] = 10
 plt.rcParams['figure.titlesize'] = 16
 
-def load_results(filename='academic_results.json'):
-    """Charge les résultats des tests depuis la racine du projet."""
-    filepath = Path(filename)
-    if not filepath.exists():
-        filepath = Path('TESTS') / filename
-        if not filepath.exists(): return None
-
-    try:
-        with open(filepath, 'r') as f:
-            content = f.read()
-        # Correction du format .50 -> 0.50
-        fixed_content = re.sub(r':\s*\.(\d+)', r': 0.\1', content)
-        return json.loads(fixed_content)
-    except: return None
-
-def plot_latency_p95(data, output=f'{RESULTS_FOLDER}/latency_p95.png'):
-    """Graphique Latence avec annotation du gain"""
-    scenarios = data['scenarios']
-    policies = ['Baseline', 'EL (Latency)']
-    latencies = [
-        float(scenarios['baseline']['latency_p95_ms']),
-        float(scenarios['el_latency']['latency_p95_ms'])
-    ]
-    colors = ['#95a5a6', '#2ecc71'] # Gris (Baseline) et Vert (Succès)
-    
-    fig, ax = plt.subplots(figsize=(8, 6))
-    bars = ax.bar(policies, latencies, color=colors, edgecolor='black', alpha=0.85)
-    
+def ordered_scenarios(scenarios):
+    """Baseline d'abord, puis les autres scénarios par ordre alphabétique."""
+    scenarios = sorted(set(scenarios))
+    if BASELINE_SCENARIO in scenarios:
+        scenarios.remove(BASELINE_SCENARIO)
+        scenarios.insert(0, BASELINE_SCENARIO)
+    return scenarios
+
+def plot_latency_p95(summary, output=f'{RESULTS_FOLDER}/latency_p95.png', metric='latency_est_ms'):
+    """Graphique Latence P95 (moyenne des runs, IC 95%) avec annotation du gain"""
+    rows = summary[(summary['metric'] == metric) & (summary['percentile'] == 'p95')].set_index('scenario')
+    scenarios = ordered_scenarios(rows.index)
+    if not scenarios:
+        print(f"Info: Aucune mesure '{metric}' à tracer")
+        return
+
+    latencies = rows.loc[scenarios, 'mean'].to_numpy()
+    errors = np.vstack([latencies - rows.loc[scenarios, 'ci_low'].to_numpy(),
+                        rows.loc[scenarios, 'ci_high'].to_numpy() - latencies])
+    n_runs = rows.loc[scenarios, 'n_runs'].to_numpy()
+    policies = [f"{SCENARIO_LABELS.get(s, s)}\n(n={n} runs)" for s, n in zip(scenarios, n_runs)]
+    colors = ['#95a5a6' if s == BASELINE_SCENARIO else '#2ecc71' for s in scenarios] # Gris (Baseline) et Vert
+
+    fig, ax = plt.subplots(figsize=(max(8, 2.5 * len(scenarios)), 6))
+    bars = ax.bar(policies, latencies, yerr=errors, capsize=6, color=colors, edgecolor='black', alpha=0.85)
+
     # Affichage des valeurs sur les barres
-    for bar, lat in zip(bars, latencies):
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height,
+    for bar, lat, err in zip(bars, latencies, errors[1]):
+        ax.text(bar.get_x() + bar.get_width()/2., lat + err,
                 f'{lat:.1f} ms', ha='center', va='bottom', fontweight='bold', fontsize=12)
-    
-    # 🌟 CALCUL ET AFFICHAGE DU GAIN
-    try:
+
+    # 🌟 CALCUL ET AFFICHAGE DU GAIN (par rapport à la baseline)
+    if scenarios[0] == BASELINE_SCENARIO and latencies[0] > 0:
         baseline_val = latencies[0]
-        el_val = latencies[1]
-        if baseline_val > 0:
+        for x, el_val in enumerate(latencies[1:], start=1):
             gain_pct = (baseline_val - el_val) / baseline_val * 100
-            
             if gain_pct > 0:
                 # Flèche et texte vert
                 ax.annotate(f'-{gain_pct:.1f}% de Latence',
-                            xy=(1, el_val), 
-                            xytext=(1, el_val + (baseline_val * 0.2)),
-                            ha='center', 
-                            color='green', 
-                            fontweight='bold', 
+                            xy=(x, el_val),
+                            xytext=(x, el_val + errors[1][x] + (baseline_val * 0.25)),
+                            ha='center',
+                            color='green',
+                            fontweight='bold',
                             fontsize=12,
                             arrowprops=dict(arrowstyle='->', color='green', lw=2),
                             bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="green", alpha=0.9))
-    except Exception as e:
-        print(f"Info: Pas d'annotation de gain ({e})")
 
     ax.set_ylabel('Latence P95 (ms)', fontweight='bold')
     ax.set_title('Impact du Scheduler RL sur la Latence 5G', fontweight='bold', pad=15)
-    
+
     # Ajuster l'échelle Y pour laisser de la place à l'annotation
-    ax.set_ylim(0, max(latencies) * 1.35)
+    ax.set_ylim(0, max(latencies + errors[1]) * 1.35)
     ax.grid(axis='y', alpha=0.3, linestyle='--')
-    
+
     plt.tight_layout()
     plt.savefig(output, dpi=300)
     print(f"✅ Graphique sauvegardé: {output}")
     plt.close()
 
-def plot_pod_distribution(data, output=f'{RESULTS_FOLDER}/pod_distribution.png'):
-    """Graphique Distribution des pods"""
-    scenarios = data['scenarios']
-    policies = ['Baseline', 'EL (Latency)']
-    
-    worker1 = [scenarios['baseline']['worker1'], scenarios['el_latency']['worker1']]
-    worker2 = [scenarios['baseline']['worker2'], scenarios['el_latency']['worker2']]
-    
-    x = np.arange(len(policies))
-    width = 0.35
-    
-    fig, ax = plt.subplots(figsize=(8, 6))
-    bars1 = ax.bar(x - width/2, worker1, width, label='Worker-1 (Low-Latency)', 
-                   color='#e74c3c', edgecolor='black', alpha=0.85)
-    bars2 = ax.bar(x + width/2, worker2, width, label='Worker-2 (Standard)', 
-                   color='#3498db', edgecolor='black', alpha=0.85)
-    
-    # Valeurs
-    for bars in [bars1, bars2]:
+def plot_pod_distribution(distribution, output=f'{RESULTS_FOLDER}/pod_distribution.png'):
+    """Graphique Distribution des pods (moyenne par run, IC 95%)"""
+    scenarios = ordered_scenarios(distribution['scenario'])
+    nodes = sorted(distribution['node'].unique())
+    table = distribution.set_index(['scenario', 'node'])
+
+    x = np.arange(len(scenarios))
+    width = 0.8 / max(len(nodes), 1)
+
+    fig, ax = plt.subplots(figsize=(max(8, 2.5 * len(scenarios)), 6))
+    for i, node in enumerate(nodes):
+        means = np.array([table['mean'].get((s, node), 0.0) for s in scenarios])
+        low = np.array([table['ci_low'].get((s, node), 0.0) for s in scenarios])
+        high = np.array([table['ci_high'].get((s, node), 0.0) for s in scenarios])
+        bars = ax.bar(x + (i - (len(nodes) - 1) / 2) * width, means, width,
+                      yerr=np.vstack([means - low, high - means]), capsize=4,
+                      label=node, edgecolor='black', alpha=0.85)
+
+        # Valeurs
         for bar in bars:
             height = bar.get_height()
             if height > 0:
                 ax.text(bar.get_x() + bar.get_width()/2., height,
-                        f'{int(height)}', ha='center', va='bottom', fontsize=10)
-    
-    ax.set_ylabel('Nombre de Pods', fontweight='bold')
+                        f'{height:.1f}', ha='center', va='bottom', fontsize=10)
+
+    ax.set_ylabel('Nombre moyen de Pods par run', fontweight='bold')
     ax.set_title('Distribution des Pods par Nœud', fontweight='bold')
     ax.set_xticks(x)
-    ax.set_xticklabels(policies)
+    ax.set_xticklabels([SCENARIO_LABELS.get(s, s) for s in scenarios])
     ax.legend(loc='upper right')
-    ax.set_ylim(0, 12)
     ax.grid(axis='y', alpha=0.3, linestyle='--')
-    
+
     plt.tight_layout()
     plt.savefig(output, dpi=300)
     print(f"✅ Graphique sauvegardé: {output}")
@@ -132,15 +135,15 @@ def plot_pod_distribution(data, output=f'{RESULTS_FOLDER}/pod_distribution.png')
 
 def main():
     print("📊 Génération des graphiques (Latence & Distribution)...")
-    data = load_results()
-    
-    if data:
+    data = load_measurements(MEASUREMENTS_FILE)
+
+    if data is not None:
         Path(RESULTS_FOLDER).mkdir(parents=True, exist_ok=True)
-        plot_latency_p95(data)
-        plot_pod_distribution(data)
+        plot_latency_p95(aggregate(data))
+        plot_pod_distribution(node_distribution(data))
         print("\n✅ Terminé. Graphiques disponibles dans TESTS/RESULTS/")
     else:
-        print("❌ Erreur: Impossible de charger academic_results.json")
+        print(f"❌ Erreur: Aucune mesure dans {MEASUREMENTS_FILE} (lancez d'abord test_academic_scenarios.sh)")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
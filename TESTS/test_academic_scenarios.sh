@@ -17,6 +17,9 @@ REPLICAS=10
 NAMESPACE="default"
 METRICS_FILE="academic_results.json"
 RESULTS_DIR="TESTS/RESULTS"
+# Store de mesures par pod, cumulé entre les runs (agrégé par TESTS/aggregate_results.py)
+MEASUREMENTS_FILE="${RESULTS_DIR}/measurements.jsonl"
+RUN_ID="${RUN_ID:-$(date +%Y%m%dT%H%M%S)-$$}"
 
 NODE_1_NAME="k3d-nexslice-agent-0" 
 NODE_2_NAME="k3d-nexslice-agent-1" 
@@ -70,6 +73,32 @@ measure_distribution() {
     return 0
 }
 
+# Fonction: Ajouter une ligne par pod au store de mesures
+# (latence de scheduling = PodScheduled - création, résolution 1s côté API)
+record_pod_measurements() {
+    local label=$1
+    local scenario=$2
+    local scheduler=$3
+
+    kubectl get pods -l app=$label -o json | jq -c \
+        --arg run_id "$RUN_ID" --arg scenario "$scenario" --arg scheduler "$scheduler" \
+        --arg fast_node "$NODE_1_NAME" '
+        .items[] | select(.spec.nodeName != null)
+        | ((.status.conditions // []) | map(select(.type == "PodScheduled")) | first | .lastTransitionTime) as $scheduled
+        | {
+            run_id: $run_id,
+            scenario: $scenario,
+            scheduler: $scheduler,
+            pod: .metadata.name,
+            node: .spec.nodeName,
+            scheduling_latency_ms: (if $scheduled then (($scheduled | fromdateiso8601) - (.metadata.creationTimestamp | fromdateiso8601)) * 1000 else null end),
+            bind_ms: null,
+            decision_ms: null,
+            latency_est_ms: (if .spec.nodeName == $fast_node then 10 else 50 end),
+            timestamp: (now | todateiso8601)
+        }' >> "$MEASUREMENTS_FILE"
+}
+
 # Fonction: Calculer les métriques (Latence uniquement)
 calculate_metrics() {
     local label=$1
@@ -80,7 +109,8 @@ calculate_metrics() {
     local latency_p95=0.00
     
     if [ "$total_pods" -gt 0 ]; then
-        latency_p95=$(echo "scale=2; ($worker1 * 10 + $worker2 * 50) / $total_pods" | bc)
+        # printf normalise la sortie de bc (".50" -> "0.50") pour un JSON valide
+        latency_p95=$(LC_NUMERIC=C printf "%.2f" "$(echo "scale=2; ($worker1 * 10 + $worker2 * 50) / $total_pods" | bc)")
     fi
 
     echo -e "${CYAN}Métriques:${NC}"
@@ -133,6 +163,7 @@ measure_distribution "baseline" 30
 BASELINE_W1=$(jq -r '.worker1' /tmp/distribution_baseline.json)
 BASELINE_W2=$(jq -r '.worker2' /tmp/distribution_baseline.json)
 calculate_metrics "baseline" $BASELINE_W1 $BASELINE_W2
+record_pod_measurements "baseline" "baseline" "kube-scheduler"
 echo -e "${GREEN}Test Baseline terminé${NC}"
 
 # --- TEST EL (LATENCY) ---
@@ -148,6 +179,10 @@ export SCHEDULER_MODE="latency" # Mode unique conservé
 export RL_USE_TRAINED_MODEL=true
 export RL_TRAINING_MODE=false
 export PYTHONUNBUFFERED=1
+# Le scheduler ajoute ses propres mesures (temps de binding, de décision) au même store
+export RL_RESULTS_PATH="$MEASUREMENTS_FILE"
+export RL_RUN_ID="$RUN_ID"
+export RL_SCENARIO="el_latency"
 
 python -m schedulers.ia_scheduler_rl > /tmp/scheduler_el.log 2>&1 &
 SCHEDULER_PID=$!
@@ -185,6 +220,7 @@ measure_distribution "el-latency" 40
 EL_W1=$(jq -r '.worker1' /tmp/distribution_el-latency.json)
 EL_W2=$(jq -r '.worker2' /tmp/distribution_el-latency.json)
 calculate_metrics "el-latency" $EL_W1 $EL_W2
+record_pod_measurements "el-latency" "el_latency" "ia-scheduler"
 
 # Arrêt propre
 kill -TERM ${SCHEDULER_PID} 2>/dev/null || true
@@ -207,12 +243,14 @@ EL_W1=${EL_W1:-0}
 EL_W2=${EL_W2:-0}
 
 # Calculs de gains
-EL_GAIN=$(echo "scale=2; 100 * (${BASELINE_LATENCY} - ${EL_LATENCY}) / ${BASELINE_LATENCY}" | bc 2>/dev/null || echo "0.00")
+EL_GAIN=$(echo "scale=2; 100 * (${BASELINE_LATENCY} - ${EL_LATENCY}) / ${BASELINE_LATENCY}" | bc 2>/dev/null || echo "0")
+EL_GAIN=$(LC_NUMERIC=C printf "%.2f" "${EL_GAIN:-0}")
 
 # ÉCRITURE FORCÉE DU JSON SIMPLIFIÉ
 cat > $METRICS_FILE << EOF
 {
     "test_date": "$(date -Iseconds)",
+    "run_id": "${RUN_ID}",
     "replicas": ${REPLICAS},
     "scenarios": {
         "baseline": {
@@ -241,4 +279,5 @@ else
 fi
 
 echo -e "\n${GREEN}Tests terminés. Vérifiez $METRICS_FILE${NC}"
+echo -e "${CYAN}Mesures par pod ajoutées à $MEASUREMENTS_FILE (run ${RUN_ID})${NC}"
 exit 0
\ No newline at end of file
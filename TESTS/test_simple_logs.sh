@@ -53,6 +53,10 @@ export RL_USE_TRAINED_MODEL=true
 export RL_TRAINING_MODE=false
 export RL_DEBUG=true
 export PYTHONUNBUFFERED=1
+mkdir -p TESTS/RESULTS
+export RL_RESULTS_PATH="TESTS/RESULTS/measurements.jsonl"
+export RL_RUN_ID="$(date +%Y%m%dT%H%M%S)-$$"
+export RL_SCENARIO="simple_lb"
 
 # Lancer scheduler en arrière-plan avec redirection explicite
 python -m schedulers.ia_scheduler_rl > /tmp/scheduler_test.log 2>&1 &
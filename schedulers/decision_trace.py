@@ -0,0 +1,375 @@
+# decision_trace.py
+"""
+Journal binaire des décisions du scheduler RL (trace de production).
+
+Chaque décision est écrite dans un enregistrement de taille fixe:
+- états de chaque nœud candidat (matrice n_nodes x state_size)
+- Q-values calculées par l'agent
+- masque des nœuds disponibles (filtre CPU)
+- nœud choisi, timestamps et durée de décision
+
+Le résultat (binding réussi, récompense) est connu plus tard: il est ajouté
+comme un second enregistrement de type OUTCOME qui référence la décision par
+son `decision_id`. Le fichier reste donc strictement append-only.
+
+Les segments sont écrits via un memmap NumPy dont l'espace disque est réservé
+à la création (posix_fallocate): un disque plein désactive la trace au lieu de
+provoquer un SIGBUS à l'écriture. Ils tournent automatiquement quand ils sont
+pleins, et seuls les `max_segments` plus récents sont conservés. La lecture ne
+fait aucun parsing: un segment est directement vu comme un tableau structuré NumPy.
+"""
+
+import os
+import glob
+import time
+import numpy as np
+from typing import Iterator, List, Optional, Tuple
+
+TRACE_MAGIC = b"RLTRACE1"
+TRACE_VERSION = 1
+SEGMENT_SUFFIX = ".rlt"
+
+# Types d'enregistrements
+KIND_DECISION = 1
+KIND_OUTCOME = 2
+
+# Flags d'un enregistrement OUTCOME
+FLAG_BOUND = 0x01
+
+# Segments conservés par défaut (~36 Mo chacun avec 65536 enregistrements)
+DEFAULT_MAX_SEGMENTS = 8
+
+# En-tête de segment (64 octets). `count` est mis à jour après chaque écriture
+# pour qu'un lecteur ne voie jamais un enregistrement partiel.
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("state_size", "<u4"),
+    ("max_nodes", "<u4"),
+    ("record_size", "<u4"),
+    ("capacity", "<u8"),
+    ("count", "<u8"),
+    ("created_ns", "<i8"),
+    ("reserved", "V16"),
+])
+HEADER_SIZE = HEADER_DTYPE.itemsize
+
+
+def record_dtype(state_size: int, max_nodes: int) -> np.dtype:
+    """Layout binaire d'un enregistrement (décision ou outcome)."""
+    return np.dtype([
+        ("kind", "u1"),
+        ("flags", "u1"),
+        ("n_nodes", "<u2"),
+        ("choice", "<i2"),
+        ("decision_id", "<u8"),
+        ("ts_ns", "<i8"),
+        ("decide_ns", "<i8"),
+        ("reward", "<f4"),
+        ("states", "<f4", (max_nodes, state_size)),
+        ("q_values", "<f4", (max_nodes,)),
+        ("mask", "u1", (max_nodes,)),
+    ], align=True)
+
+
+class DecisionTraceWriter:
+    """
+    Écrit les décisions dans des segments memmap à enregistrements fixes.
+    Un nouveau segment est ouvert à chaque démarrage et à chaque rotation.
+    Si l'espace disque ne peut pas être réservé, la trace se désactive
+    (`enabled` passe à False) et les appels deviennent sans effet.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        state_size: int = 7,
+        max_nodes: int = 16,
+        segment_records: int = 65536,
+        max_segments: int = DEFAULT_MAX_SEGMENTS
+    ):
+        self.directory = directory
+        self.state_size = state_size
+        self.max_nodes = max_nodes
+        self.segment_records = segment_records
+        self.max_segments = max_segments  # 0 = conserver tous les segments
+        self.enabled = True
+        self.dtype = record_dtype(state_size, max_nodes)
+
+        self._seq = 0
+        self._last_id = 0
+        self._header = None
+        self._records = None
+        self._cols = None
+        self._count = None
+        self._slot = 0
+        try:
+            os.makedirs(directory, exist_ok=True)
+            existing = list_segments(directory)
+        except OSError as e:
+            self.enabled = False
+            print(f"⚠️ Trace des décisions désactivée (répertoire {directory} inutilisable: {e})")
+            return
+        self._seq = _segment_seq(existing[-1]) + 1 if existing else 0
+        self._try_open_segment()
+
+    def _try_open_segment(self) -> bool:
+        try:
+            self._open_segment()
+            return True
+        except OSError as e:
+            self.enabled = False
+            print(f"⚠️ Trace des décisions désactivée (segment impossible à allouer: {e})")
+            return False
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"trace-{seq:06d}{SEGMENT_SUFFIX}")
+
+    def _open_segment(self):
+        path = self._segment_path(self._seq)
+        size = HEADER_SIZE + self.segment_records * self.dtype.itemsize
+        _allocate_file(path, size)
+
+        self._header = np.memmap(path, dtype=HEADER_DTYPE, mode="r+", shape=(1,))
+        self._header["magic"] = TRACE_MAGIC
+        self._header["version"] = TRACE_VERSION
+        self._header["state_size"] = self.state_size
+        self._header["max_nodes"] = self.max_nodes
+        self._header["record_size"] = self.dtype.itemsize
+        self._header["capacity"] = self.segment_records
+        self._header["count"] = 0
+        self._header["created_ns"] = time.time_ns()
+        self._records = np.memmap(
+            path, dtype=self.dtype, mode="r+",
+            offset=HEADER_SIZE, shape=(self.segment_records,)
+        )
+        # Vues ndarray par champ sur le même buffer: évite le coût de la
+        # sous-classe memmap et des np.void à chaque écriture (~µs par champ)
+        records = np.asarray(self._records)
+        self._cols = {name: records[name] for name in self.dtype.names}
+        self._count = np.asarray(self._header)["count"]
+        self._slot = 0
+        self._prune_segments()
+
+    def _prune_segments(self):
+        if self.max_segments <= 0:
+            return
+        segments = list_segments(self.directory)
+        for old in segments[:-self.max_segments]:
+            os.remove(old)
+
+    def _rotate(self) -> bool:
+        self._close_segment()
+        self._seq += 1
+        return self._try_open_segment()
+
+    def _close_segment(self):
+        if self._records is not None:
+            self._records.flush()
+            self._header.flush()
+            self._cols = None
+            self._count = None
+            self._records = None
+            self._header = None
+
+    def _next_slot(self) -> Optional[int]:
+        if not self.enabled:
+            return None
+        if self._slot >= self.segment_records and not self._rotate():
+            return None
+        return self._slot
+
+    def _commit(self):
+        self._slot += 1
+        self._count[0] = self._slot
+
+    def _next_id(self, ts_ns: int) -> int:
+        # Identifiant strictement croissant, dérivé de l'horloge (unique entre redémarrages)
+        self._last_id = max(self._last_id + 1, ts_ns)
+        return self._last_id
+
+    def log_decision(
+        self,
+        states: np.ndarray,
+        q_values: Optional[np.ndarray],
+        mask: Optional[np.ndarray],
+        choice: int,
+        decide_ns: int = 0
+    ) -> Optional[int]:
+        """
+        Enregistre une décision et retourne son decision_id (None si trace désactivée).
+        Les nœuds au-delà de `max_nodes` sont tronqués.
+
+        Args:
+            states: array (n_nodes, state_size)
+            q_values: Q-values par nœud (None si action d'exploration)
+            mask: booléens des nœuds disponibles (None = tous)
+            choice: index du nœud choisi
+            decide_ns: durée de la décision en nanosecondes
+        """
+        # Le segment est pré-rempli de zéros et chaque slot n'est écrit qu'une
+        # fois: seules les n premières lignes sont à copier
+        slot = self._next_slot()
+        if slot is None:
+            return None
+        ts_ns = time.time_ns()
+        decision_id = self._next_id(ts_ns)
+        n = min(len(states), self.max_nodes)
+
+        cols = self._cols
+        cols["kind"][slot] = KIND_DECISION
+        cols["n_nodes"][slot] = n
+        cols["choice"][slot] = choice
+        cols["decision_id"][slot] = decision_id
+        cols["ts_ns"][slot] = ts_ns
+        cols["decide_ns"][slot] = decide_ns
+        cols["reward"][slot] = np.nan
+        cols["states"][slot, :n] = states[:n]
+        if q_values is None:
+            cols["q_values"][slot, :n] = np.nan
+        else:
+            cols["q_values"][slot, :n] = q_values[:n]
+        cols["mask"][slot, :n] = 1 if mask is None else mask[:n]
+        self._commit()
+        return decision_id
+
+    def log_outcome(self, decision_id: int, reward: float, bound: bool, choice: int = -1):
+        """Ajoute le résultat (binding, récompense) d'une décision déjà tracée."""
+        slot = self._next_slot()
+        if slot is None:
+            return
+        cols = self._cols
+        cols["kind"][slot] = KIND_OUTCOME
+        cols["flags"][slot] = FLAG_BOUND if bound else 0
+        cols["choice"][slot] = choice
+        cols["decision_id"][slot] = decision_id
+        cols["ts_ns"][slot] = time.time_ns()
+        cols["reward"][slot] = reward
+        self._commit()
+
+    def flush(self):
+        if self._records is not None:
+            self._records.flush()
+            self._header.flush()
+
+    def close(self):
+        self._close_segment()
+
+
+def _allocate_file(path: str, size: int):
+    """Crée un fichier de `size` octets dont l'espace disque est réellement réservé."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, size)
+        else:
+            # macOS: pas de posix_fallocate, on écrit les zéros explicitement
+            chunk = bytes(1 << 20)
+            remaining = size
+            while remaining > 0:
+                remaining -= os.write(fd, chunk[:min(remaining, len(chunk))])
+    except OSError:
+        os.close(fd)
+        os.remove(path)
+        raise
+    os.close(fd)
+
+
+def _segment_seq(path: str) -> int:
+    name = os.path.basename(path)
+    return int(name[len("trace-"):-len(SEGMENT_SUFFIX)])
+
+
+def list_segments(directory: str) -> List[str]:
+    """
+    Liste les segments d'un répertoire de trace, du plus ancien au plus récent.
+    Les fichiers dont le nom n'a pas de numéro de séquence sont ignorés.
+    """
+    paths = glob.glob(os.path.join(directory, f"trace-*{SEGMENT_SUFFIX}"))
+    paths = [p for p in paths if os.path.basename(p)[len("trace-"):-len(SEGMENT_SUFFIX)].isdigit()]
+    return sorted(paths, key=_segment_seq)
+
+
+def read_segment(path: str) -> np.ndarray:
+    """Retourne les enregistrements valides d'un segment (vue memmap, sans copie)."""
+    header = np.memmap(path, dtype=HEADER_DTYPE, mode="r", shape=(1,))[0]
+    if header["magic"] != TRACE_MAGIC or header["version"] != TRACE_VERSION:
+        raise ValueError(f"Segment de trace invalide: {path}")
+
+    dtype = record_dtype(int(header["state_size"]), int(header["max_nodes"]))
+    if dtype.itemsize != int(header["record_size"]):
+        raise ValueError(f"Taille d'enregistrement incohérente: {path}")
+
+    count = int(header["count"])
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def iter_segments(directory: str) -> Iterator[np.ndarray]:
+    """Itère sur les segments d'une trace (streaming, un segment à la fois)."""
+    for path in list_segments(directory):
+        yield read_segment(path)
+
+
+def _outcome_index(directory: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Index (decision_id, reward) des bindings réussis, trié par decision_id.
+    Seules les colonnes des outcomes sont lues (12 octets par outcome).
+    """
+    ids = []
+    rewards = []
+    for records in iter_segments(directory):
+        kind = records["kind"]
+        bound = (kind == KIND_OUTCOME) & ((records["flags"] & FLAG_BOUND) != 0)
+        ids.append(np.asarray(records["decision_id"][bound]))
+        rewards.append(np.asarray(records["reward"][bound]))
+
+    if not ids:
+        return np.empty(0, dtype="<u8"), np.empty(0, dtype="<f4")
+    ids = np.concatenate(ids)
+    rewards = np.concatenate(rewards)
+    order = np.argsort(ids)
+    return ids[order], rewards[order]
+
+
+def iter_transitions(directory: str) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Joint les décisions à leur outcome, un segment à la fois.
+
+    Yields:
+        (decisions, rewards): enregistrements DECISION d'un segment ayant un
+        outcome lié à un binding réussi, et la récompense associée
+    """
+    outcome_ids, outcome_rewards = _outcome_index(directory)
+    if len(outcome_ids) == 0:
+        return
+
+    for records in iter_segments(directory):
+        decisions = records[records["kind"] == KIND_DECISION]
+        if len(decisions) == 0:
+            continue
+
+        # Jointure vectorisée par decision_id
+        pos = np.searchsorted(outcome_ids, decisions["decision_id"])
+        pos = np.clip(pos, 0, len(outcome_ids) - 1)
+        matched = outcome_ids[pos] == decisions["decision_id"]
+        matched &= decisions["choice"] < decisions["n_nodes"]
+        matched &= decisions["choice"] >= 0
+        if matched.any():
+            yield decisions[matched], outcome_rewards[pos[matched]]
+
+
+def fill_replay_buffer(buffer, directory: str) -> int:
+    """
+    Remplit un ReplayBuffer avec les transitions tracées.
+    Même format que RLSchedulerAgent._update_dqn: (s, a, r, s', done).
+    """
+    count = 0
+    for decisions, rewards in iter_transitions(directory):
+        for rec, reward in zip(decisions, rewards):
+            choice = int(rec["choice"])
+            state = rec["states"][choice]
+            buffer.push(state, choice, float(reward), state, True)
+        count += len(decisions)
+    return count
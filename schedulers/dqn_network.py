@@ -0,0 +1,26 @@
+# dqn_network.py
+"""
+Réseau de neurones PyTorch du DQN (entraînement et agent complet).
+Importé uniquement à la construction d'un agent DQN complet: le chemin
+d'inférence seule du scheduler n'importe jamais PyTorch.
+"""
+
+import torch
+import torch.nn as nn
+
+
+class DQNetwork(nn.Module):
+    """
+    Réseau de neurones pour Deep Q-Learning.
+    Architecture: state_size -> 64 -> 32 -> 1 (Q-value)
+    """
+    def __init__(self, state_size: int):
+        super(DQNetwork, self).__init__()
+        self.fc1 = nn.Linear(state_size, 64)
+        self.fc2 = nn.Linear(64, 32)
+        self.fc3 = nn.Linear(32, 1)  # Output: Q-value pour ce nœud
+
+    def forward(self, x):
+        x = torch.relu(self.fc1(x))
+        x = torch.relu(self.fc2(x))
+        return self.fc3(x)
@@ -0,0 +1,86 @@
+# health.py
+"""
+Endpoints HTTP de santé du scheduler pour les sondes Kubernetes.
+
+- /healthz : liveness, 200 tant que les checks de liveness passent
+             (ex: watch des nœuds pas coupé trop longtemps), 503 sinon
+- /readyz  : readiness, 200 une fois le modèle chargé et le cache de nœuds
+             chaud, et tant que les checks de readiness passent
+
+Le serveur tourne dans un thread daemon. Il démarre en tête de
+main_scheduler_loop, après les imports du module (client kubernetes compris),
+mais avant la connexion à l'API et le chargement du modèle.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+
+
+class HealthState:
+    """État de santé partagé entre la boucle du scheduler et le serveur HTTP."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.ready_after_s: Optional[float] = None
+        self._ready = threading.Event()
+        self._ready_checks: List[Callable[[], bool]] = []
+        self._live_checks: List[Callable[[], bool]] = []
+
+    def add_ready_check(self, check: Callable[[], bool]):
+        self._ready_checks.append(check)
+
+    def add_live_check(self, check: Callable[[], bool]):
+        self._live_checks.append(check)
+
+    def set_ready(self):
+        if not self._ready.is_set():
+            self.ready_after_s = time.monotonic() - self.started_at
+            self._ready.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set() and all(check() for check in self._ready_checks)
+
+    @property
+    def live(self) -> bool:
+        return all(check() for check in self._live_checks)
+
+
+def _make_handler(state: HealthState):
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/healthz":
+                if state.live:
+                    self._reply(200, b"ok")
+                else:
+                    self._reply(503, b"unhealthy")
+            elif self.path == "/readyz":
+                if state.ready:
+                    self._reply(200, b"ready")
+                else:
+                    self._reply(503, b"not ready")
+            else:
+                self._reply(404, b"not found")
+
+        def _reply(self, status: int, body: bytes):
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Les sondes tapent toutes les secondes: pas de log par requête
+            pass
+
+    return HealthHandler
+
+
+def start_health_server(state: HealthState, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Démarre le serveur de santé dans un thread daemon."""
+    server = ThreadingHTTPServer((host, port), _make_handler(state))
+    thread = threading.Thread(target=server.serve_forever, name="health-server", daemon=True)
+    thread.start()
+    return server
@@ -4,12 +4,18 @@ Scheduler Kubernetes avec Reinforcement Learning (DQN/Q-Learning).
 
 import time
 import os
+import json
+from datetime import datetime, timezone
 import numpy as np
 from kubernetes import client, config, watch
 from kubernetes.client.rest import ApiException
 
 from schedulers.rl_environment import KubernetesSchedulingEnv
 from schedulers.rl_agent import RLSchedulerAgent
+from schedulers.decision_trace import DecisionTraceWriter
+from schedulers.health import HealthState, start_health_server
+from schedulers.shadow import (ShadowStats, score_scheduled_pod, placed_by_kube_scheduler,
+                               SKIP_PREASSIGNED, SKIP_OTHER_SCHEDULER)
 
 # Configuration RL
 USE_TRAINED_MODEL = os.getenv('RL_USE_TRAINED_MODEL', 'true').lower() == 'true'
@@ -17,6 +23,28 @@ MODEL_PATH = os.getenv('RL_MODEL_PATH', 'rl_scheduler_model.pth')
 TRAINING_MODE = os.getenv('RL_TRAINING_MODE', 'false').lower() == 'true'
 DEBUG_MODE = os.getenv('RL_DEBUG', 'true').lower() == 'true'
 
+# Trace binaire des décisions (désactivée si RL_TRACE_DIR est vide)
+TRACE_DIR = os.getenv('RL_TRACE_DIR', '')
+TRACE_SEGMENT_RECORDS = int(os.getenv('RL_TRACE_SEGMENT_RECORDS', '65536'))
+TRACE_MAX_SEGMENTS = int(os.getenv('RL_TRACE_MAX_SEGMENTS', '8'))
+TRACE_MAX_NODES = int(os.getenv('RL_TRACE_MAX_NODES', '16'))
+
+# Sondes de santé (0 = désactivées, le manifeste Kubernetes fixe le port)
+HEALTH_PORT = int(os.getenv('RL_HEALTH_PORT', '0'))
+NODE_CACHE_TIMEOUT = float(os.getenv('RL_NODE_CACHE_TIMEOUT', '30'))
+# Liveness en échec si le watch des nœuds reste coupé plus longtemps (s)
+LIVENESS_WATCH_TIMEOUT = float(os.getenv('RL_LIVENESS_WATCH_TIMEOUT', '120'))
+
+# Mode shadow: évalue les placements de kube-scheduler sans rien binder
+SHADOW_MODE = os.getenv('RL_SHADOW_MODE', 'false').lower() == 'true'
+SHADOW_REPORT_EVERY = int(os.getenv('RL_SHADOW_REPORT_EVERY', '50'))  # 0 = résumé final uniquement
+SHADOW_REPORT_PATH = os.getenv('RL_SHADOW_REPORT_PATH', '')
+
+# Store de mesures par pod (JSONL, agrégé par TESTS/aggregate_results.py)
+RESULTS_PATH = os.getenv('RL_RESULTS_PATH', '')
+RUN_ID = os.getenv('RL_RUN_ID', datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S'))
+SCENARIO = os.getenv('RL_SCENARIO', 'el_latency')
+
 # IMPORTANT: Doit correspondre au champ schedulerName dans vos YAMLs
 SCHEDULER_NAME = 'ia-scheduler'
 
@@ -28,7 +56,35 @@ def load_k8s_config():
         config.load_kube_config()
         print("✓ Configuration locale (kubeconfig) chargée")
 
-def schedule_pod_with_rl(v1_api, env, agent, pod_name, pod_namespace, training=False):
+def append_measurement(env, pod_name, node_name, decide_ns, bind_ns, pod_created=None):
+    """
+    Ajoute une ligne de mesure pour un pod au store JSONL.
+    La latence vue par le scheduler (horloge locale après binding - création) a
+    sa propre colonne: scheduling_latency_ms reste la définition de l'API
+    (PodScheduled - création), identique pour tous les scénarios.
+    """
+    now = datetime.now(timezone.utc)
+    rl_observed_latency_ms = None
+    if pod_created is not None:
+        rl_observed_latency_ms = (now - pod_created).total_seconds() * 1e3
+    
+    record = {
+        "run_id": RUN_ID,
+        "scenario": SCENARIO,
+        "scheduler": SCHEDULER_NAME,
+        "pod": pod_name,
+        "node": node_name,
+        "rl_observed_latency_ms": rl_observed_latency_ms,
+        "bind_ms": bind_ns / 1e6,
+        "decision_ms": decide_ns / 1e6,
+        "latency_est_ms": env.estimate_latency_ms(node_name),
+        "timestamp": now.isoformat(),
+    }
+    with open(RESULTS_PATH, 'a') as f:
+        f.write(json.dumps(record) + "\n")
+
+def schedule_pod_with_rl(v1_api, env, agent, pod_name, pod_namespace, training=False, tracer=None,
+                         pod_created=None):
     try:
         # 1. Récupérer l'état
         states, node_names = env.reset(pod_name)
@@ -54,15 +110,46 @@ def schedule_pod_with_rl(v1_api, env, agent, pod_name, pod_namespace, training=F
 
         # 3. Sélection Action via Agent
         # L'agent décide sur quel index (parmi tous les nœuds) il veut aller
+        t0 = time.perf_counter_ns()
         node_idx, selected_node = agent.select_action(states, node_names, training=training)
+        decide_ns = time.perf_counter_ns() - t0
         
         # Si l'agent choisit un nœud saturé alors qu'il y a mieux, on pourrait forcer, 
         # mais pour le RL on le laisse faire ses erreurs (ou ses réussites).
         
         print(f"🤖 Décision IA: {selected_node}")
         
+        # La trace ne doit jamais empêcher le binding
+        decision_id = None
+        if tracer is not None:
+            try:
+                mask = np.zeros(len(node_names), dtype=bool)
+                mask[available_indices] = True
+                decision_id = tracer.log_decision(states, agent.last_q_values, mask, node_idx, decide_ns)
+            except Exception as e:
+                print(f"⚠️ Trace de la décision impossible: {e}")
+        
         # 4. Binding
-        return bind_pod_to_node(v1_api, pod_name, pod_namespace, selected_node)
+        t_bind = time.perf_counter_ns()
+        bound = bind_pod_to_node(v1_api, pod_name, pod_namespace, selected_node)
+        bind_ns = time.perf_counter_ns() - t_bind
+        
+        # 5. Outcome (pour le ré-entraînement offline)
+        if decision_id is not None:
+            try:
+                reward = env.calculate_reward(node_idx, states, node_names) if bound else 0.0
+                tracer.log_outcome(decision_id, reward, bound, node_idx)
+            except Exception as e:
+                print(f"⚠️ Trace du résultat impossible: {e}")
+        
+        # 6. Mesures: un store inaccessible ne change pas le résultat du binding
+        if RESULTS_PATH and bound:
+            try:
+                append_measurement(env, pod_name, selected_node, decide_ns, bind_ns, pod_created)
+            except Exception as e:
+                print(f"⚠️ Mesure non enregistrée ({RESULTS_PATH}: {e})")
+        
+        return bound
 
     except Exception as e:
         print(f"❌ Exception dans schedule_pod_with_rl: {e}")
@@ -89,36 +176,138 @@ def bind_pod_to_node(v1_api, pod_name, pod_namespace, node_name):
             print(f"❌ ÉCHEC TOTAL pour {pod_name}: {e2}")
             return False
 
+def _fmt(value, spec, unit=""):
+    """Formate une statistique shadow, 'n/a' tant qu'elle n'existe pas."""
+    return "n/a" if value is None else f"{value:{spec}}{unit}"
+
+def report_shadow_stats(stats):
+    summary = stats.summary()
+    print(f"📈 Shadow: {summary['decisions']} décisions | "
+          f"accord {_fmt(summary['agreement_rate'], '.1%')} | "
+          f"gain latence prédit {_fmt(summary['mean_latency_gain_ms'], '.1f', ' ms')} | "
+          f"inférence p95 {_fmt(summary['inference_us']['p95'], '.0f', ' µs')} | "
+          f"exclus {sum(summary['skipped'].values())} {summary['skipped'] or ''}")
+    if SHADOW_REPORT_PATH:
+        # Un rapport impossible à écrire ne doit pas arrêter l'observation
+        try:
+            os.makedirs(os.path.dirname(SHADOW_REPORT_PATH) or '.', exist_ok=True)
+            with open(SHADOW_REPORT_PATH, 'w') as f:
+                json.dump(summary, f, indent=4)
+        except OSError as e:
+            print(f"⚠️ Rapport shadow non écrit ({SHADOW_REPORT_PATH}: {e})")
+
+def shadow_loop(v1_api, env, agent):
+    """Compare l'agent aux placements des autres schedulers, sans binding."""
+    stats = ShadowStats()
+    started = datetime.now(timezone.utc)
+    scored = set()   # UIDs déjà évalués
+    pending = set()  # UIDs vus sans nœud: candidats à un placement par un scheduler
+    
+    w = watch.Watch()
+    print("\n👻 Mode shadow: évaluation des pods placés par kube-scheduler...")
+    try:
+        for event in w.stream(v1_api.list_pod_for_all_namespaces, timeout_seconds=0):
+            pod = event['object']
+            uid = pod.metadata.uid
+            
+            if event['type'] == 'DELETED':
+                scored.discard(uid)
+                pending.discard(uid)
+                continue
+            
+            # Seuls les pods créés après le démarrage et tout juste placés sont comparés
+            if (pod.spec.scheduler_name == SCHEDULER_NAME or
+                uid in scored or
+                pod.metadata.creation_timestamp < started):
+                continue
+            if pod.spec.node_name is None:
+                pending.add(uid)
+                continue
+            
+            scored.add(uid)
+            if uid not in pending:
+                # Jamais vu en attente: nodeName fixé à la création, aucun scheduler
+                stats.record_skip(SKIP_PREASSIGNED)
+                rl_node = None
+            elif not placed_by_kube_scheduler(pod):
+                stats.record_skip(SKIP_OTHER_SCHEDULER)
+                rl_node = None
+            else:
+                rl_node, actual_node, gain_ms = score_scheduled_pod(env, agent, pod, stats)
+                if DEBUG_MODE and rl_node is not None:
+                    print(f"👻 {pod.metadata.name}: réel={actual_node} | IA={rl_node} | gain={gain_ms:+.1f} ms")
+            pending.discard(uid)
+            
+            # Rapport uniquement quand une décision vient d'être enregistrée
+            if (rl_node is not None and SHADOW_REPORT_EVERY > 0 and
+                stats.decisions % SHADOW_REPORT_EVERY == 0):
+                report_shadow_stats(stats)
+    finally:
+        if stats.decisions or stats.skipped:
+            report_shadow_stats(stats)
+
 def main_scheduler_loop():
     print("\n" + "="*60)
     print(f"🚀 Démarrage Scheduler IA: '{SCHEDULER_NAME}'")
     print("="*60)
     
+    # Liveness dès avant la connexion à l'API, readiness une fois le cache chaud
+    health = HealthState()
+    if HEALTH_PORT:
+        try:
+            start_health_server(health, HEALTH_PORT)
+            print(f"✓ Sondes de santé sur le port {HEALTH_PORT} (/healthz, /readyz)")
+        except OSError as e:
+            print(f"⚠️ Sondes de santé désactivées (port {HEALTH_PORT}: {e})")
+    
     load_k8s_config()
     v1_api = client.CoreV1Api()
     
-    # Test de connexion et vérification des nœuds
-    try:
-        nodes = v1_api.list_node()
-        print(f"✓ Connecté à l'API K8s. {len(nodes.items)} nœuds détectés.")
-        for n in nodes.items:
-            print(f"  - {n.metadata.name} (Roles: {n.metadata.labels.get('kubernetes.io/role', 'agent')})")
-    except Exception as e:
-        print(f"❌ Impossible de lister les nœuds: {e}")
-        return
-
+    # Le cache de nœuds se remplit en arrière-plan pendant le chargement du modèle
     env = KubernetesSchedulingEnv(v1_api)
-    # Agent simplifié pour garantir le fonctionnement sans modèle
-    agent = RLSchedulerAgent(state_size=7, use_dqn=True, model_path=MODEL_PATH)
+    env.start_node_watch()
+    # Pas prêt tant que le watch est coupé, redémarrage s'il le reste trop longtemps
+    health.add_ready_check(env.node_watch_up.is_set)
+    health.add_live_check(lambda: env.node_watch_down_for() < LIVENESS_WATCH_TIMEOUT)
+    
+    # Inférence seule hors entraînement: ni target network ni optimizer à construire
+    agent = RLSchedulerAgent(state_size=7, use_dqn=True, model_path=MODEL_PATH,
+                             inference_only=not TRAINING_MODE)
     
     # Essai de chargement, sinon initialisation à zéro
     if USE_TRAINED_MODEL:
         agent.load_model()
-
-    w = watch.Watch()
-    print(f"\n🎧 En écoute des pods Pending avec schedulerName='{SCHEDULER_NAME}'...")
     
+    # Première inférence à vide pour ne pas payer l'initialisation sur le premier pod
+    if agent.use_dqn:
+        agent.select_action(np.zeros((1, 7)), ["warmup"], training=False)
+    
+    if not env.node_cache_ready.wait(timeout=NODE_CACHE_TIMEOUT):
+        print(f"❌ Impossible de lister les nœuds après {NODE_CACHE_TIMEOUT:.0f}s")
+        return
+    print("✓ Connecté à l'API K8s, cache de nœuds chaud.")
+    
+    tracer = None
+    if TRACE_DIR:
+        tracer = DecisionTraceWriter(
+            TRACE_DIR,
+            state_size=7,
+            max_nodes=TRACE_MAX_NODES,
+            segment_records=TRACE_SEGMENT_RECORDS,
+            max_segments=TRACE_MAX_SEGMENTS
+        )
+        print(f"📝 Trace des décisions activée: {TRACE_DIR}")
+    
+    health.set_ready()
+    print(f"✓ Scheduler prêt en {health.ready_after_s * 1000:.0f} ms")
+
     try:
+        if SHADOW_MODE:
+            shadow_loop(v1_api, env, agent)
+            return
+        
+        w = watch.Watch()
+        print(f"\n🎧 En écoute des pods Pending avec schedulerName='{SCHEDULER_NAME}'...")
         for event in w.stream(v1_api.list_pod_for_all_namespaces, timeout_seconds=0):
             pod = event['object']
             
@@ -127,12 +316,17 @@ def main_scheduler_loop():
                 pod.spec.node_name is None):
                 
                 print(f"\n⚡ Pod détecté: {pod.metadata.name}")
-                schedule_pod_with_rl(v1_api, env, agent, pod.metadata.name, pod.metadata.namespace, training=TRAINING_MODE)
+                schedule_pod_with_rl(v1_api, env, agent, pod.metadata.name, pod.metadata.namespace,
+                                     training=TRAINING_MODE, tracer=tracer,
+                                     pod_created=pod.metadata.creation_timestamp)
                 
     except KeyboardInterrupt:
         print("Arrêt.")
     except Exception as e:
         print(f"Erreur critique boucle: {e}")
+    finally:
+        if tracer is not None:
+            tracer.close()
 
 if __name__ == "__main__":
     main_scheduler_loop()
\ No newline at end of file
@@ -16,36 +16,60 @@ Inspiré de:
 import numpy as np
 import pickle
 import os
+import hashlib
+import importlib.util
 from typing import List, Tuple, Optional
 from collections import deque
 import random
 
-# Import optionnel de PyTorch (si disponible)
-try:
-    import torch
-    import torch.nn as nn
-    import torch.optim as optim
-    TORCH_AVAILABLE = True
-except ImportError:
-    TORCH_AVAILABLE = False
-    print("PyTorch non disponible. Utilisation de Q-Learning tabulaire.")
+# Import optionnel de PyTorch: on vérifie seulement sa présence ici. L'agent
+# complet l'importe à sa construction; l'agent d'inférence seule s'en passe
+# (forward pass NumPy sur les poids exportés en .npz).
+TORCH_AVAILABLE = importlib.util.find_spec("torch") is not None
+if not TORCH_AVAILABLE:
+    print("PyTorch non disponible. Inférence DQN en NumPy, entraînement en Q-Learning tabulaire.")
 
 
-class DQNetwork(nn.Module):
+def _file_sha256(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class NumpyQNetwork:
     """
-    Réseau de neurones pour Deep Q-Learning.
-    Architecture: state_size -> 64 -> 32 -> 1 (Q-value)
+    Forward pass du DQNetwork en NumPy (state_size -> 64 -> 32 -> 1).
+    Les poids sont exportés en .npz à côté du .pth, avec le SHA-256 du .pth
+    source pour détecter un export périmé.
     """
-    def __init__(self, state_size: int):
-        super(DQNetwork, self).__init__()
-        self.fc1 = nn.Linear(state_size, 64)
-        self.fc2 = nn.Linear(64, 32)
-        self.fc3 = nn.Linear(32, 1)  # Output: Q-value pour ce nœud
-        
-    def forward(self, x):
-        x = torch.relu(self.fc1(x))
-        x = torch.relu(self.fc2(x))
-        return self.fc3(x)
+    LAYERS = ("fc1", "fc2", "fc3")
+
+    def __init__(self, weights: dict):
+        self.weights = {k: np.asarray(v, dtype=np.float32) for k, v in weights.items()}
+
+    @classmethod
+    def random(cls, state_size: int):
+        """Initialisation identique à nn.Linear: U(-1/sqrt(fan_in), 1/sqrt(fan_in))."""
+        weights = {}
+        for name, (fan_in, fan_out) in zip(cls.LAYERS, [(state_size, 64), (64, 32), (32, 1)]):
+            bound = 1.0 / np.sqrt(fan_in)
+            weights[f"{name}_weight"] = np.random.uniform(-bound, bound, (fan_out, fan_in))
+            weights[f"{name}_bias"] = np.random.uniform(-bound, bound, fan_out)
+        return cls(weights)
+
+    @classmethod
+    def from_state_dict(cls, state_dict):
+        """Convertit le state_dict PyTorch du DQNetwork ('fc1.weight' -> 'fc1_weight')."""
+        return cls({k.replace('.', '_'): v.detach().cpu().numpy() for k, v in state_dict.items()})
+
+    def forward(self, states: np.ndarray) -> np.ndarray:
+        w = self.weights
+        x = np.asarray(states, dtype=np.float32)
+        x = np.maximum(x @ w["fc1_weight"].T + w["fc1_bias"], 0.0)
+        x = np.maximum(x @ w["fc2_weight"].T + w["fc2_bias"], 0.0)
+        return (x @ w["fc3_weight"].T + w["fc3_bias"]).ravel()
+
+    def save(self, path: str, epsilon: float, source_sha256: str = ""):
+        np.savez(path, epsilon=np.float64(epsilon), source_sha256=np.array(source_sha256), **self.weights)
 
 
 class ReplayBuffer:
@@ -82,7 +106,8 @@ class RLSchedulerAgent:
         epsilon: float = 1.0,
         epsilon_min: float = 0.01,
         epsilon_decay: float = 0.995,
-        model_path: str = "rl_scheduler_model.pth"
+        model_path: str = "rl_scheduler_model.pth",
+        inference_only: bool = False
     ):
         self.state_size = state_size
         self.gamma = gamma  # Discount factor
@@ -90,12 +115,24 @@ class RLSchedulerAgent:
         self.epsilon_min = epsilon_min
         self.epsilon_decay = epsilon_decay
         self.model_path = model_path
+        # Inférence seule: forward pass NumPy, sans PyTorch ni état d'entraînement
+        self.inference_only = inference_only
+        self.last_q_values = None  # Q-values de la dernière décision (None si exploration)
         
-        # Mode DQN ou Q-Learning tabulaire
-        self.use_dqn = use_dqn and TORCH_AVAILABLE
+        # Mode DQN ou Q-Learning tabulaire (l'inférence DQN n'a besoin que de NumPy)
+        self.use_dqn = use_dqn and (TORCH_AVAILABLE or inference_only)
         
-        if self.use_dqn:
+        if self.use_dqn and inference_only:
+            self.numpy_net = NumpyQNetwork.random(state_size)
+            self.numpy_source_sha256 = ""  # SHA-256 du .pth dont viennent les poids ("" = aléatoires)
+            print("🧠 Agent DQN initialisé en inférence seule (NumPy)")
+        elif self.use_dqn:
             # Deep Q-Network
+            import torch
+            import torch.nn as nn
+            import torch.optim as optim
+            from schedulers.dqn_network import DQNetwork
+            
             self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
             self.policy_net = DQNetwork(state_size).to(self.device)
             self.target_net = DQNetwork(state_size).to(self.device)
@@ -136,6 +173,7 @@ class RLSchedulerAgent:
         """
         # Exploration: action aléatoire
         if training and random.random() < self.epsilon:
+            self.last_q_values = None
             node_idx = random.randint(0, len(node_names) - 1)
             return node_idx, node_names[node_idx]
         
@@ -144,6 +182,7 @@ class RLSchedulerAgent:
             q_values = self._get_q_values_dqn(states)
         else:
             q_values = self._get_q_values_tabular(states)
+        self.last_q_values = q_values  # Conservé pour la trace des décisions
         
         # Sélectionner le nœud avec le meilleur Q-value
         best_node_idx = int(np.argmax(q_values))
@@ -151,6 +190,10 @@ class RLSchedulerAgent:
     
     def _get_q_values_dqn(self, states: np.ndarray) -> np.ndarray:
         """Calcule les Q-values avec le réseau de neurones."""
+        if self.inference_only:
+            return self.numpy_net.forward(states)
+        
+        import torch
         self.policy_net.eval()
         with torch.no_grad():
             states_tensor = torch.FloatTensor(states).to(self.device)
@@ -191,6 +234,9 @@ class RLSchedulerAgent:
             next_states: états après l'action (pour Q-learning multi-step)
             done: True si l'épisode est terminé
         """
+        if self.inference_only:
+            raise RuntimeError("Agent en mode inférence seule: apprentissage impossible")
+        
         if self.use_dqn:
             self._update_dqn(states, action_idx, reward, next_states, done)
         else:
@@ -202,6 +248,8 @@ class RLSchedulerAgent:
     
     def _update_dqn(self, states, action_idx, reward, next_states, done):
         """Mise à jour DQN avec experience replay."""
+        import torch
+        
         # Stocker la transition
         state = states[action_idx]  # État du nœud choisi
         next_state = next_states[action_idx] if next_states is not None else state
@@ -261,10 +309,15 @@ class RLSchedulerAgent:
         self.q_table[state_hash] = current_q + self.learning_rate * (target_q - current_q)
     
     def save_model(self, path: Optional[str] = None):
-        """Sauvegarde le modèle entraîné."""
+        """Sauvegarde le modèle entraîné (et ses poids NumPy pour l'inférence)."""
         save_path = path or self.model_path
+        npz_path = save_path.replace('.pth', '.npz')
         
-        if self.use_dqn:
+        if self.use_dqn and self.inference_only:
+            self.numpy_net.save(npz_path, self.epsilon, self.numpy_source_sha256)
+            print(f"✅ Poids NumPy sauvegardés: {npz_path}")
+        elif self.use_dqn:
+            import torch
             torch.save({
                 'policy_net': self.policy_net.state_dict(),
                 'target_net': self.target_net.state_dict(),
@@ -272,7 +325,9 @@ class RLSchedulerAgent:
                 'epsilon': self.epsilon,
                 'train_step': self.train_step_counter
             }, save_path)
-            print(f"✅ Modèle DQN sauvegardé: {save_path}")
+            NumpyQNetwork.from_state_dict(self.policy_net.state_dict()).save(
+                npz_path, self.epsilon, _file_sha256(save_path))
+            print(f"✅ Modèle DQN sauvegardé: {save_path} (+ {npz_path})")
         else:
             with open(save_path.replace('.pth', '.pkl'), 'wb') as f:
                 pickle.dump({
@@ -281,16 +336,61 @@ class RLSchedulerAgent:
                 }, f)
             print(f"✅ Q-table sauvegardée: {save_path.replace('.pth', '.pkl')}")
     
+    def _load_inference_model(self, load_path: str) -> bool:
+        """Charge les poids NumPy, en les ré-exportant depuis le .pth si besoin."""
+        npz_path = load_path.replace('.pth', '.npz')
+        source_sha256 = _file_sha256(load_path) if os.path.exists(load_path) else None
+        
+        exported = None
+        if os.path.exists(npz_path):
+            with np.load(npz_path) as data:
+                exported = (NumpyQNetwork({k: data[k] for k in data.files
+                                           if k not in ('epsilon', 'source_sha256')}),
+                            float(data['epsilon']), str(data['source_sha256']))
+            if source_sha256 is None or exported[2] == source_sha256:
+                self.numpy_net, self.epsilon, self.numpy_source_sha256 = exported
+                print(f"✅ Poids NumPy chargés: {npz_path}")
+                return True
+            print(f"⚠️ Poids NumPy périmés par rapport à {load_path}, ré-export...")
+        
+        if source_sha256 is not None and TORCH_AVAILABLE:
+            # Chemin lent (import PyTorch), une seule fois: l'export sert aux démarrages suivants
+            import torch
+            checkpoint = torch.load(load_path, map_location="cpu")
+            self.numpy_net = NumpyQNetwork.from_state_dict(checkpoint['policy_net'])
+            self.epsilon = checkpoint.get('epsilon', self.epsilon_min)
+            self.numpy_source_sha256 = source_sha256
+            try:
+                self.numpy_net.save(npz_path, self.epsilon, source_sha256)
+            except OSError as e:
+                print(f"⚠️ Export NumPy impossible ({e})")
+            print(f"✅ Modèle DQN chargé (inférence NumPy): {load_path}")
+            return True
+        
+        if exported is not None:
+            # Sans PyTorch, un export périmé vaut mieux qu'une politique aléatoire
+            self.numpy_net, self.epsilon, self.numpy_source_sha256 = exported
+            print(f"❗ ATTENTION: PyTorch indisponible, ré-export impossible. Utilisation des poids "
+                  f"NumPy PÉRIMÉS de {npz_path} (ne correspondent pas à {load_path}). "
+                  f"Régénérer l'export avec PyTorch installé.")
+            return True
+        return False
+    
     def load_model(self, path: Optional[str] = None):
         """Charge un modèle pré-entraîné."""
         load_path = path or self.model_path
         
-        if self.use_dqn:
+        if self.use_dqn and self.inference_only:
+            if self._load_inference_model(load_path):
+                return True
+        elif self.use_dqn:
             if os.path.exists(load_path):
+                import torch
                 checkpoint = torch.load(load_path, map_location=self.device)
                 self.policy_net.load_state_dict(checkpoint['policy_net'])
-                self.target_net.load_state_dict(checkpoint['target_net'])
-                self.optimizer.load_state_dict(checkpoint['optimizer'])
+                self.target_net.load_state_dict(checkpoint.get('target_net', checkpoint['policy_net']))
+                if 'optimizer' in checkpoint:
+                    self.optimizer.load_state_dict(checkpoint['optimizer'])
                 self.epsilon = checkpoint.get('epsilon', self.epsilon_min)
                 self.train_step_counter = checkpoint.get('train_step', 0)
                 print(f"✅ Modèle DQN chargé: {load_path}")
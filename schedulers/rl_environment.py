@@ -1,7 +1,9 @@
 # schedulers/rl_environment.py
+import threading
+import time
 import numpy as np
-from typing import Tuple, List
-from kubernetes import client
+from typing import Tuple, List, Optional
+from kubernetes import client, watch
 
 class KubernetesSchedulingEnv:
     def __init__(self, v1_api: client.CoreV1Api):
@@ -11,8 +13,63 @@ class KubernetesSchedulingEnv:
         # Un seul poids compte : La Latence
         self.LATENCY_WEIGHT = 200.0     
 
+        # Latence estimée par type de nœud (même modèle que TESTS/test_academic_scenarios.sh)
+        self.LOW_LATENCY_MS = 10.0
+        self.STANDARD_LATENCY_MS = 50.0
+
+        # Cache des nœuds (nom -> V1Node) maintenu par start_node_watch()
+        self._node_cache = {}
+        self._cache_lock = threading.Lock()
+        self.node_cache_ready = threading.Event()
+        # État du watch: coupé => cache potentiellement périmé
+        self.node_watch_up = threading.Event()
+        self._node_watch_down_since: Optional[float] = None
+
+    def start_node_watch(self) -> threading.Thread:
+        """Remplit puis maintient le cache de nœuds dans un thread daemon."""
+        self._node_watch_down_since = time.monotonic()
+        thread = threading.Thread(target=self._watch_nodes, name="node-watch", daemon=True)
+        thread.start()
+        return thread
+
+    def _watch_nodes(self):
+        while True:
+            try:
+                node_list = self.v1_api.list_node()
+                with self._cache_lock:
+                    self._node_cache = {n.metadata.name: n for n in node_list.items}
+                self.node_cache_ready.set()
+                self.node_watch_up.set()
+                self._node_watch_down_since = None
+
+                w = watch.Watch()
+                for event in w.stream(self.v1_api.list_node,
+                                      resource_version=node_list.metadata.resource_version):
+                    node = event['object']
+                    with self._cache_lock:
+                        if event['type'] == 'DELETED':
+                            self._node_cache.pop(node.metadata.name, None)
+                        else:
+                            self._node_cache[node.metadata.name] = node
+            except Exception as e:
+                if self.node_watch_up.is_set():
+                    self.node_watch_up.clear()
+                    self._node_watch_down_since = time.monotonic()
+                print(f"⚠️ Watch des nœuds interrompu ({e}), nouvelle tentative...")
+                time.sleep(1)
+
+    def node_watch_down_for(self) -> float:
+        """Durée (s) depuis laquelle le watch des nœuds est coupé, 0 s'il tourne."""
+        down_since = self._node_watch_down_since
+        return 0.0 if down_since is None else time.monotonic() - down_since
+
     def reset(self, pod_to_schedule: str) -> Tuple[np.ndarray, List[str]]:
-        nodes = self.v1_api.list_node().items
+        # Cache chaud: pas d'appel API par pod
+        if self.node_cache_ready.is_set():
+            with self._cache_lock:
+                nodes = list(self._node_cache.values())
+        else:
+            nodes = self.v1_api.list_node().items
         candidate_nodes = []
         for n in nodes:
             if "agent" in n.metadata.name:
@@ -35,6 +92,10 @@ class KubernetesSchedulingEnv:
         # On ignore le CPU (0.0 partout)
         return np.array([is_low_latency, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0])
     
+    def estimate_latency_ms(self, node_name: str) -> float:
+        is_low_latency = self._get_node_state(node_name)[0] == 1.0
+        return self.LOW_LATENCY_MS if is_low_latency else self.STANDARD_LATENCY_MS
+
     def calculate_reward(self, action_idx: int, states: np.ndarray, node_names: List[str]) -> float:
         node_state = states[action_idx]
         is_low_latency = (node_state[0] == 1.0)
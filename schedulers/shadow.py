@@ -0,0 +1,94 @@
+# shadow.py
+"""
+Mode shadow: évalue l'agent RL sur les pods placés par kube-scheduler, sans binding.
+
+Pour chaque pod déjà placé, on calcule le nœud que l'agent aurait choisi et on
+mesure:
+- le taux d'accord avec le placement réel
+- le gain de latence prédit (latence estimée du nœud réel - nœud RL)
+- le coût de décision (construction de l'état + inférence)
+
+Seuls les pods réellement placés par kube-scheduler sur un nœud candidat de
+l'agent sont comparés; les autres sont comptés à part par raison d'exclusion.
+"""
+
+import time
+from collections import Counter, deque
+import numpy as np
+
+KUBE_SCHEDULER_NAME = "default-scheduler"
+
+# Raisons d'exclusion d'un pod placé
+SKIP_PREASSIGNED = "preassigned"              # nodeName fixé à la création
+SKIP_OTHER_SCHEDULER = "other_scheduler"      # placé par un autre scheduler
+SKIP_NODE_NOT_CANDIDATE = "node_not_candidate"  # nœud hors de l'espace d'actions
+
+
+class ShadowStats:
+    """Statistiques cumulées du mode shadow (latences sur une fenêtre glissante)."""
+
+    def __init__(self, window: int = 10000):
+        self.decisions = 0
+        self.agreements = 0
+        self.total_gain_ms = 0.0
+        self.skipped = Counter()
+        self.state_us = deque(maxlen=window)
+        self.inference_us = deque(maxlen=window)
+
+    def record(self, agree: bool, gain_ms: float, state_ns: int, inference_ns: int):
+        self.decisions += 1
+        self.agreements += int(agree)
+        self.total_gain_ms += gain_ms
+        self.state_us.append(state_ns / 1e3)
+        self.inference_us.append(inference_ns / 1e3)
+
+    def record_skip(self, reason: str):
+        self.skipped[reason] += 1
+
+    def summary(self) -> dict:
+        def percentiles(values):
+            if not values:
+                return {"p50": None, "p95": None, "p99": None}
+            p50, p95, p99 = np.percentile(np.fromiter(values, dtype=float), [50, 95, 99])
+            return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+        return {
+            "decisions": self.decisions,
+            "skipped": dict(self.skipped),
+            "agreement_rate": self.agreements / self.decisions if self.decisions else None,
+            "mean_latency_gain_ms": self.total_gain_ms / self.decisions if self.decisions else None,
+            "state_us": percentiles(self.state_us),
+            "inference_us": percentiles(self.inference_us),
+        }
+
+
+def placed_by_kube_scheduler(pod) -> bool:
+    """Vrai si le pod a été bindé par kube-scheduler (condition PodScheduled)."""
+    if pod.spec.scheduler_name != KUBE_SCHEDULER_NAME:
+        return False
+    conditions = pod.status.conditions if pod.status else None
+    return any(c.type == "PodScheduled" and c.status == "True" for c in conditions or [])
+
+
+def score_scheduled_pod(env, agent, pod, stats: ShadowStats):
+    """
+    Calcule la décision RL pour un pod déjà placé et met à jour les stats.
+    Un pod placé sur un nœud hors des candidats de l'agent est compté comme
+    exclu (rl_node = None) au lieu d'être comparé.
+
+    Returns:
+        (rl_node, actual_node, gain_ms)
+    """
+    actual_node = pod.spec.node_name
+    t0 = time.perf_counter_ns()
+    states, node_names = env.reset(pod.metadata.name)
+    t1 = time.perf_counter_ns()
+    if actual_node not in node_names:
+        stats.record_skip(SKIP_NODE_NOT_CANDIDATE)
+        return None, actual_node, 0.0
+    _, rl_node = agent.select_action(states, node_names, training=False)
+    t2 = time.perf_counter_ns()
+
+    gain_ms = env.estimate_latency_ms(actual_node) - env.estimate_latency_ms(rl_node)
+    stats.record(rl_node == actual_node, gain_ms, t1 - t0, t2 - t1)
+    return rl_node, actual_node, gain_ms
@@ -1,10 +1,12 @@
 # train_rl_scheduler.py
+import os
 import numpy as np
 import matplotlib.pyplot as plt
 from typing import List, Tuple
 from kubernetes import client, config
 from schedulers.rl_environment import KubernetesSchedulingEnv
 from schedulers.rl_agent import RLSchedulerAgent
+from schedulers.decision_trace import iter_transitions
 
 def load_k8s_config():
     """Charge la configuration Kubernetes."""
@@ -104,5 +106,55 @@ def train_rl_agent(num_episodes=200):
     # Génération du graphique
     plot_training_results(all_rewards, all_epsilons)
 
+def count_agreements(agent, decisions):
+    """Nombre de décisions tracées identiques au choix greedy de l'agent."""
+    agree = 0
+    for rec in decisions:
+        n = int(rec["n_nodes"])
+        states = rec["states"][:n]
+        node_idx, _ = agent.select_action(states, list(range(n)), training=False)
+        agree += int(node_idx == rec["choice"])
+    return agree
+
+def evaluate_on_trace(agent, trace_dir):
+    """Taux d'accord entre la politique de l'agent et les décisions tracées."""
+    agree = total = 0
+    for decisions, _ in iter_transitions(trace_dir):
+        agree += count_agreements(agent, decisions)
+        total += len(decisions)
+    return agree / total if total else 0.0
+
+def train_from_trace(trace_dir, num_epochs=5, model_path="rl_scheduler_model.pth"):
+    """Ré-entraîne l'agent offline à partir de la trace binaire (lue segment par segment)."""
+    print(f"🚀 Entraînement offline depuis la trace: {trace_dir}")
+    agent = None
+    
+    for epoch in range(num_epochs):
+        total = 0
+        for decisions, rewards in iter_transitions(trace_dir):
+            if agent is None:
+                agent = RLSchedulerAgent(state_size=decisions["states"].shape[2], use_dqn=True, model_path=model_path)
+                agent.load_model()
+            
+            for idx in np.random.permutation(len(decisions)):
+                rec = decisions[idx]
+                n = int(rec["n_nodes"])
+                agent.update(rec["states"][:n], int(rec["choice"]), float(rewards[idx]), done=True)
+            total += len(decisions)
+        
+        if agent is None:
+            print("❌ Aucune transition exploitable dans la trace.")
+            return None
+        
+        agreement = evaluate_on_trace(agent, trace_dir)
+        print(f"Epoch {epoch+1}/{num_epochs} | {total} transitions | Accord avec la trace: {agreement:.1%}")
+    
+    agent.save_model()
+    return agent
+
 if __name__ == "__main__":
-    train_rl_agent()
\ No newline at end of file
+    trace_dir = os.getenv('RL_TRAIN_TRACE_DIR', '')
+    if trace_dir:
+        train_from_trace(trace_dir)
+    else:
+        train_rl_agent()
\ No newline at end of file